@@ -35,6 +35,12 @@ class JoinInfo:
     foreign_table_column: str
     join_description: Optional[str]
 
+# --- Schema CSV files (relative to the data folder) ---
+TABLES_CSV = "table_related_information.csv"
+COLUMNS_CSV = "column_related_information.csv"
+JOINS_CSV = "join_related_information.csv"
+SCHEMA_CSV_FILES = (TABLES_CSV, COLUMNS_CSV, JOINS_CSV)
+
 # --- CSVSchemaLoader Class ---
 class CSVSchemaLoader:
     def __init__(self, data_folder_path: str = "data/"):
@@ -64,7 +70,7 @@ class CSVSchemaLoader:
         return records
 
     def _load_tables(self):
-        records = self._read_csv("table_related_information.csv")
+        records = self._read_csv(TABLES_CSV)
         for rec in records:
             table = TableInfo(
                 source_database=rec.get('Source_database', '').strip(),
@@ -76,7 +82,7 @@ class CSVSchemaLoader:
                 self.tables[table.name] = table
     
     def _load_columns(self):
-        records = self._read_csv("column_related_information.csv")
+        records = self._read_csv(COLUMNS_CSV)
         for rec in records:
             column = ColumnInfo(
                 database_name=rec.get('Database_name', '').strip(),
@@ -93,7 +99,7 @@ class CSVSchemaLoader:
                 self.columns.append(column)
 
     def _load_joins(self):
-        records = self._read_csv("join_related_information.csv")
+        records = self._read_csv(JOINS_CSV)
         for rec in records:
             join = JoinInfo(
                 source_database=rec.get('Source_Database', '').strip(),
@@ -1,4 +1,5 @@
 import os
+import functools
 from sqlalchemy import create_engine, text
 from datetime import datetime, timedelta
 import random
@@ -7,8 +8,10 @@ from rag_context import RAGContextProvider
 # Ensure data directory exists
 os.makedirs('data', exist_ok=True)
 
-# Initialize the RAG context provider
-rag_provider = RAGContextProvider()
+@functools.lru_cache(maxsize=None)
+def get_rag_provider() -> RAGContextProvider:
+    """Create the RAG context provider on first use, so importing this module stays cheap."""
+    return RAGContextProvider()
 
 def initialize_database():
     """Initialize the database (not needed with RAG approach)."""
@@ -16,15 +19,15 @@ def initialize_database():
 
 def get_table_info():
     """Get information about all tables and their columns."""
-    return rag_provider.get_table_info()
+    return get_rag_provider().get_table_info()
 
 def get_formatted_schema():
     """Get a formatted string representation of the schema."""
-    return rag_provider.full_schema
+    return get_rag_provider().full_schema
 
 def get_relevant_schema_context(query: str):
     """Get relevant schema context for a query."""
-    return rag_provider.get_relevant_context(query)
+    return get_rag_provider().get_relevant_context(query)
 
 def get_formatted_schema():
     """Get a formatted string representation of the database schema."""
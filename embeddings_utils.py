@@ -0,0 +1,43 @@
+import os
+import functools
+from typing import Optional
+
+try:
+    from langchain_openai import OpenAIEmbeddings
+except ImportError:
+    print("langchain_openai not available. Please ensure langchain_openai is installed.")
+    # Dummy class so importing modules keep working if langchain_openai is missing
+    class OpenAIEmbeddings:
+        def __init__(self, model, openai_api_key=None, **kwargs): pass
+        def embed_query(self, query_text): return [0.1] * 1536 # Dummy embedding
+        def embed_documents(self, texts): return [[0.1] * 1536 for _ in texts]
+
+EMBEDDING_MODEL_NAME = "text-embedding-3-small"
+
+# OpenAI accepts up to 2048 inputs per embeddings request; embed_documents chunks by this size
+EMBEDDING_BATCH_SIZE = 2048
+
+
+def get_embeddings(openai_api_key: Optional[str] = None) -> OpenAIEmbeddings:
+    """
+    Returns the process-wide OpenAI embeddings client for the given API key.
+
+    The retriever, the embedding store and the LLM utilities all share this instance, so its
+    HTTP connection pool (and TLS handshake to the API) is set up once per process.
+
+    Args:
+        openai_api_key: OpenAI API key. If None, OPENAI_API_KEY from the environment is used.
+    """
+    # Resolve the key before the cached call, so callers passing None and callers passing
+    # os.getenv("OPENAI_API_KEY") share one client instead of getting one each
+    return _get_embeddings(openai_api_key or os.getenv("OPENAI_API_KEY"))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_embeddings(openai_api_key: Optional[str]) -> OpenAIEmbeddings:
+    """Builds the embeddings client; cached per resolved API key."""
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL_NAME,
+        openai_api_key=openai_api_key,
+        chunk_size=EMBEDDING_BATCH_SIZE
+    )
@@ -6,10 +6,11 @@ from llm_utils import (
     parse_query_explanation, get_relevant_schema_context # Removed validate_sql_query, execute_sql_query
 )
 from db_setup import get_formatted_schema
+import os
+import html
 import json
 import logging
 import pathlib
-from langchain_openai import OpenAIEmbeddings
 from langchain.vectorstores import FAISS
 from langchain.schema import Document
 
@@ -17,6 +18,10 @@ from langchain.schema import Document
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Set DUMP_PROMPTS=1 to log the full prompt templates, retrieved context and filled prompts.
+# They can run to tens of KB per call, so by default only their lengths are logged.
+DUMP_PROMPTS = os.getenv("DUMP_PROMPTS") == "1"
+
 # Define the state type
 class GraphState(TypedDict):
     """Type for the state of the Text2SQL graph."""
@@ -32,9 +37,6 @@ class GraphState(TypedDict):
     _recursion_count: int
     conversation_history: List[Dict[str, Any]]
 
-# Replace any existing embedding model with OpenAI
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")  # or text-embedding-3-large for better quality
-
 # Define the graph nodes
 def explain_query_node(state: GraphState) -> GraphState:
     """Node that explains the query."""
@@ -46,7 +48,7 @@ def explain_query_node(state: GraphState) -> GraphState:
     logger.debug("explain_query_node: Retrieving relevant schema context...")
     context = get_relevant_schema_context(query)
     relevant_schema = context["relevant_schema"]
-    relevant_statements = context.get("relevant_statements", "") # Ensure it's a string, even if empty
+    relevant_statements = context["relevant_statements"] # Always set by RAGContextProvider (an error message on failure)
 
     # Log details of the context
     logger.debug(f"explain_query_node: Type of relevant_schema: {type(relevant_schema)}, Length: {len(relevant_schema) if isinstance(relevant_schema, (str, list, dict)) else 'N/A'}")
@@ -59,19 +61,19 @@ def explain_query_node(state: GraphState) -> GraphState:
         logger.debug("explain_query_node: Getting query explanation prompt template...")
         prompt_template = get_query_explanation_prompt()
         
-        # ---> ADD NEW LOGGING HERE <---
-        logger.debug("------------- PROMPT TEMPLATE TO BE FORMATTED -------------")
-        logger.debug(f"TEMPLATE STRING: {prompt_template.template}")
-        logger.debug("---------------------------------------------------------")
-        logger.debug("------------- RELEVANT SCHEMA FOR FORMATTING -------------")
-        logger.debug(relevant_schema) # Log full content
-        logger.debug("----------------------------------------------------------")
-        logger.debug("------------- RELEVANT STATEMENTS FOR FORMATTING -------------")
-        logger.debug(relevant_statements) # Log full content
-        logger.debug("--------------------------------------------------------------")
-        logger.debug("------------- QUERY FOR FORMATTING -------------")
-        logger.debug(query) # Log full content
-        logger.debug("------------------------------------------------")
+        if DUMP_PROMPTS:
+            logger.debug("------------- PROMPT TEMPLATE TO BE FORMATTED -------------")
+            logger.debug(f"TEMPLATE STRING: {prompt_template.template}")
+            logger.debug("---------------------------------------------------------")
+            logger.debug("------------- RELEVANT SCHEMA FOR FORMATTING -------------")
+            logger.debug(relevant_schema) # Log full content
+            logger.debug("----------------------------------------------------------")
+            logger.debug("------------- RELEVANT STATEMENTS FOR FORMATTING -------------")
+            logger.debug(relevant_statements) # Log full content
+            logger.debug("--------------------------------------------------------------")
+            logger.debug("------------- QUERY FOR FORMATTING -------------")
+            logger.debug(query) # Log full content
+            logger.debug("------------------------------------------------")
         
         formatted_prompt_str = "" # Initialize
         
@@ -82,8 +84,9 @@ def explain_query_node(state: GraphState) -> GraphState:
                 relevant_statements=relevant_statements,
                 query=query
             )
-            logger.debug(f"explain_query_node: Successfully formatted prompt. Length: {len(formatted_prompt_str)}")
-            logger.debug(f"explain_query_node: Formatted prompt (first 500 chars): {formatted_prompt_str[:500]}...")
+            logger.debug("explain_query_node: Successfully formatted prompt. Length: %d chars", len(formatted_prompt_str))
+            if DUMP_PROMPTS:
+                logger.debug(f"explain_query_node: Formatted prompt (first 500 chars): {formatted_prompt_str[:500]}...")
         except Exception as format_exception:
             logger.error(f"explain_query_node: ERROR DURING PROMPT FORMATTING: {format_exception}", exc_info=True)
             logger.error(f"explain_query_node: String of format_exception: {str(format_exception)}")
@@ -130,6 +133,10 @@ def explain_query_node(state: GraphState) -> GraphState:
                     "type": "query_understanding",
                     "summary": query_summary,
                     "breakdown": step_by_step_breakdown,
+                    # Escaped once here for the HTML card, so LLM text can't inject markup
+                    "summary_html": html.escape(str(query_summary)),
+                    "breakdown_html": [html.escape(str(step)) for step in step_by_step_breakdown]
+                        if isinstance(step_by_step_breakdown, list) else html.escape(str(step_by_step_breakdown)),
                     "structured_explanation_raw": explanation_dict
                 })
             elif explanation_dict.get("summary_of_understanding"):
@@ -183,20 +190,25 @@ def generate_sql_node(state: GraphState) -> GraphState:
     # Get relevant schema context using RAG
     context = get_relevant_schema_context(query)
     relevant_schema = context["relevant_schema"]
-    relevant_statements = context.get("relevant_statements", "")
+    relevant_statements = context["relevant_statements"]
     
     # Generate the SQL
     try:
         # Get the prompt for SQL generation
         prompt = get_sql_generation_prompt()
         
-        # Generate the SQL
-        response = llm.invoke(prompt.format(
+        formatted_prompt_str = prompt.format(
             relevant_schema=relevant_schema,
             relevant_statements=relevant_statements,
             query=query,
             explanation=json.dumps(query_explanation)
-        ))
+        )
+        logger.debug("generate_sql_node: SQL generation prompt length: %d chars", len(formatted_prompt_str))
+        if DUMP_PROMPTS:
+            logger.debug(f"generate_sql_node: SQL generation prompt:\n{formatted_prompt_str}")
+        
+        # Generate the SQL
+        response = llm.invoke(formatted_prompt_str)
         
         # Log the response
         logger.debug(f"LLM response: {response.content}")
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from pydantic_models import QueryExplanation, SQLOutput, QueryResult
 import json
@@ -9,6 +9,7 @@ import logging
 import re
 import pandas as pd
 from db_setup import get_relevant_schema_context
+from embeddings_utils import get_embeddings
 
 # Load environment variables
 load_dotenv()
@@ -82,11 +83,8 @@ def parse_query_explanation(response_text):
         return None, f"Error parsing explanation: {str(e)}"
 
 def get_embeddings_model():
-    """Returns the OpenAI embeddings model."""
-    return OpenAIEmbeddings(
-        model="text-embedding-3-small",  # or text-embedding-3-large
-        openai_api_key=os.getenv("OPENAI_API_KEY")
-    )
+    """Returns the shared OpenAI embeddings model."""
+    return get_embeddings(os.getenv("OPENAI_API_KEY"))
 
 def embed_text(text):
     """Embeds a single text string using OpenAI."""
@@ -1,4 +1,6 @@
 import os
+import asyncio
+import traceback
 from dotenv import load_dotenv
 
 # Assuming these files are in the same directory or accessible via PYTHONPATH
@@ -7,7 +9,7 @@ from rag_sql_llm import RAGSQLGenerator
 
 # --- Configuration Variables ---
 DDL_FILE_PATH = "data/database_schema.sql"
-FAISS_INDEX_FOLDER_PATH = "data/context_faiss_store_v1" # Consistent with other scripts
+FAISS_INDEX_FOLDER_PATH = "data/context_faiss_store_v2" # Consistent with other scripts
 
 def create_dummy_ddl_if_not_exists():
     """Creates a dummy DDL file if the specified one doesn't exist."""
@@ -33,7 +35,7 @@ def create_dummy_ddl_if_not_exists():
         print(f"Dummy DDL created at {DDL_FILE_PATH}")
 
 
-def main():
+async def main():
     """
     Main function to run the RAG SQL generation pipeline.
     """
@@ -122,32 +124,34 @@ def main():
     print("NOTE: The following questions are tailored for a schema derived from CSV files (Patients, Admissions, etc.).")
     print("For these to work correctly with main_pipeline.py, the FAISS index (context store) would also need to be built from the CSV schema descriptions, not the dummy DDL.")
 
-    for user_question in user_questions:
-        print(f"\n--- Processing Question: \"{user_question}\" ---")
-        try:
-            # k_retrieved_items can be tuned
-            sql_query = rag_generator.generate_sql_query(user_question, k_retrieved_items=7) 
-            print(f"User Question: {user_question}")
-            print(f"Generated SQL Query:\n{sql_query}")
-            print("\n--- Evaluation Suggestions (Manual) ---")
-            print("- Is the SQL syntactically correct?")
-            print("- Does the query answer the user's question based on the (dummy) schema?")
-            print("- Are table and column names used correctly (e.g., Users.full_name, Claims.total_amount)?")
-            print("- Are JOINs (if needed) present and correct?")
-            print("- Are aggregations (COUNT, SUM, etc.) and filters (WHERE clauses) appropriate?")
-            print("---------------------------------------\n")
+    # The questions are independent, so generate them concurrently; k_retrieved_items can be tuned
+    sql_results = await asyncio.gather(
+        *(rag_generator.agenerate_sql_query(question, k_retrieved_items=7) for question in user_questions),
+        return_exceptions=True
+    )
 
-        except Exception as e:
-            print(f"An error occurred while processing question '{user_question}': {e}")
-            import traceback
-            traceback.print_exc()
+    for user_question, sql_query in zip(user_questions, sql_results):
+        print(f"\n--- Processing Question: \"{user_question}\" ---")
+        if isinstance(sql_query, Exception):
+            print(f"An error occurred while processing question '{user_question}': {sql_query}")
+            traceback.print_exception(type(sql_query), sql_query, sql_query.__traceback__)
+            continue
+
+        print(f"User Question: {user_question}")
+        print(f"Generated SQL Query:\n{sql_query}")
+        print("\n--- Evaluation Suggestions (Manual) ---")
+        print("- Is the SQL syntactically correct?")
+        print("- Does the query answer the user's question based on the (dummy) schema?")
+        print("- Are table and column names used correctly (e.g., Users.full_name, Claims.total_amount)?")
+        print("- Are JOINs (if needed) present and correct?")
+        print("- Are aggregations (COUNT, SUM, etc.) and filters (WHERE clauses) appropriate?")
+        print("---------------------------------------\n")
 
     print("\n--- RAG SQL Generation Pipeline Finished ---")
 
 if __name__ == '__main__':
     try:
-        main()
+        asyncio.run(main())
     except Exception as e:
         print(f"An unexpected error occurred in the main pipeline: {e}")
-        import traceback
         traceback.print_exc()
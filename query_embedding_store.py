@@ -1,31 +1,84 @@
 import os
 import pickle
 import json
+import uuid
+import shutil
+import hashlib
+import inspect
 from dotenv import load_dotenv
 
 try:
-    from langchain_openai import OpenAIEmbeddings
+    import faiss
+    import numpy as np
     from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
     from langchain.schema import Document
 except ImportError:
     print("Langchain modules not fully available. Please ensure langchain, langchain_openai, langchain_community are installed.")
     # Define dummy classes for basic script structure to work if langchain is missing
-    class OpenAIEmbeddings:
-        def __init__(self, model, openai_api_key): pass
     class FAISS:
         @staticmethod
         def from_documents(documents, embedding): return FAISS()
         def save_local(self, folder_path): print(f"Dummy save to {folder_path}")
         @staticmethod
-        def load_local(folder_path, embeddings, allow_dangerous_deserialization): print(f"Dummy load from {folder_path}"); return FAISS()
+        def load_local(folder_path, embeddings, allow_dangerous_deserialization, **kwargs): print(f"Dummy load from {folder_path}"); return FAISS()
         def similarity_search(self, query, k): return []
 
+    class DistanceStrategy:
+        MAX_INNER_PRODUCT = "MAX_INNER_PRODUCT"
     class Document:
         def __init__(self, page_content, metadata): pass
 
 
 from schema_description_generator import SchemaDescriptionGenerator
 from example_query_generator import ExampleQueryGenerator
+from embeddings_utils import EMBEDDING_MODEL_NAME, get_embeddings
+import csv_schema_loader
+from csv_schema_loader import SCHEMA_CSV_FILES
+
+# Content-addressed cache of document embeddings, kept outside the FAISS folder so vectors
+# survive an index rebuild. Keys hash the model name together with the document text.
+EMBEDDING_CACHE_PATH = "data/.emb_cache"
+
+# HNSW graph over 8-bit scalar-quantized vectors for the context index
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 40
+
+# Written into the store folder at build time; records the inputs the index was built from
+STORE_KEY_FILE = "store_key.txt"
+
+
+def context_store_key(data_folder_path: str = "data/") -> str:
+    """
+    Returns a hash of the inputs the context store is built from: the table, column and join
+    CSVs, the source of the modules that turn them into documents, the embedding model and
+    the index layout. A store saved with the same key can be loaded instead of rebuilt.
+
+    Example queries are sampled at random, so two builds with the same key may index
+    different examples; the key only says that nothing they are drawn from has changed.
+    """
+    store_hash = hashlib.sha256()
+    for file_name in SCHEMA_CSV_FILES:
+        store_hash.update(file_name.encode())
+        with open(os.path.join(data_folder_path, file_name), 'rb') as f:
+            store_hash.update(f.read())
+    for source_object in (SchemaDescriptionGenerator, ExampleQueryGenerator, csv_schema_loader):
+        with open(inspect.getfile(source_object), 'rb') as f:
+            store_hash.update(f.read())
+    store_hash.update(f"{EMBEDDING_MODEL_NAME}|HNSWSQ8|{HNSW_M}|{HNSW_EF_CONSTRUCTION}".encode())
+    return store_hash.hexdigest()
+
+
+def read_store_key(folder_path: str) -> str | None:
+    """Returns the key saved with the store in folder_path, or None if it has none."""
+    try:
+        with open(os.path.join(folder_path, STORE_KEY_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
 
 class QueryEmbeddingStore:
     """
@@ -43,7 +96,13 @@ class QueryEmbeddingStore:
         """
         self.faiss_folder_path = faiss_folder_path
         try:
-            self.embeddings_model = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=openai_api_key)
+            underlying_embeddings = get_embeddings(openai_api_key)
+            # Unchanged documents are served from disk instead of being re-embedded on rebuild
+            self.embeddings_model = CacheBackedEmbeddings.from_bytes_store(
+                underlying_embeddings,
+                LocalFileStore(EMBEDDING_CACHE_PATH),
+                namespace=EMBEDDING_MODEL_NAME
+            )
         except Exception as e:
             print(f"Error initializing OpenAIEmbeddings: {e}. Ensure OPENAI_API_KEY is valid.")
             self.embeddings_model = None # Or raise error
@@ -101,6 +160,50 @@ class QueryEmbeddingStore:
             
         return documents
 
+    def _build_quantized_vector_store(self, documents: list[Document]) -> FAISS:
+        """
+        Embeds the documents in one batch and indexes them in an HNSW graph whose
+        vectors are stored with an 8-bit scalar quantizer (a quarter of the FP32 size).
+        Queries traverse the graph instead of scanning every vector.
+
+        Vectors are L2-normalized so that inner product equals cosine similarity.
+
+        Args:
+            documents: The Document objects to embed and index.
+
+        Returns:
+            A LangChain FAISS vector store backed by the quantized index.
+        """
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+
+        # FAISS works on C-contiguous float32 matrices; converting once here means neither
+        # train nor add has to make its own converted copy
+        vectors = np.ascontiguousarray(self.embeddings_model.embed_documents(texts), dtype=np.float32)
+        faiss.normalize_L2(vectors)
+
+        dimension = vectors.shape[1]
+        index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.train(vectors) # Learns the scalar quantizer's per-dimension ranges
+
+        # Add the float32 matrix directly rather than via add_embeddings, which would need it
+        # as Python float lists and convert them back into a new array
+        index.add(vectors)
+        doc_ids = [str(uuid.uuid4()) for _ in documents]
+
+        return FAISS(
+            embedding_function=self.embeddings_model,
+            index=index,
+            docstore=InMemoryDocstore({
+                doc_id: Document(page_content=text, metadata=metadata)
+                for doc_id, text, metadata in zip(doc_ids, texts, metadatas)
+            }),
+            index_to_docstore_id=dict(enumerate(doc_ids)),
+            normalize_L2=True, # Expected to log LangChain's "Normalizing L2 is not applicable" warning
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+
     def build_and_save_store(self):
         """
         Builds the FAISS vector store from schema and query data and saves it locally.
@@ -113,13 +216,27 @@ class QueryEmbeddingStore:
 
         if documents:
             try:
-                print(f"Building FAISS index with {len(documents)} documents...")
-                self.vector_store = FAISS.from_documents(documents=documents, embedding=self.embeddings_model)
-                
-                # Ensure the directory for faiss_folder_path exists
-                os.makedirs(self.faiss_folder_path, exist_ok=True)
+                print(f"Building quantized FAISS index with {len(documents)} documents...")
+                self.vector_store = self._build_quantized_vector_store(documents)
                 
-                self.vector_store.save_local(folder_path=self.faiss_folder_path)
+                # Save into a sibling temp folder, move the previous index aside, then rename the
+                # new one into place. A reader never sees a partially written index, and the old
+                # index survives (as <folder>.old) until the new one is in place.
+                folder_path = self.faiss_folder_path.rstrip(os.sep)
+                tmp_folder_path = folder_path + ".tmp"
+                old_folder_path = folder_path + ".old"
+                for stale_path in (tmp_folder_path, old_folder_path):
+                    if os.path.exists(stale_path):
+                        shutil.rmtree(stale_path)
+                os.makedirs(tmp_folder_path, exist_ok=True)
+
+                self.vector_store.save_local(folder_path=tmp_folder_path)
+                with open(os.path.join(tmp_folder_path, STORE_KEY_FILE), 'w') as f:
+                    f.write(context_store_key())
+                if os.path.exists(folder_path):
+                    os.rename(folder_path, old_folder_path)
+                os.replace(tmp_folder_path, folder_path)
+                shutil.rmtree(old_folder_path, ignore_errors=True)
                 print(f"FAISS index built and saved to folder: {self.faiss_folder_path}")
                 # FAISS typically saves index.faiss and index.pkl within this folder.
             except Exception as e:
@@ -144,7 +261,11 @@ class QueryEmbeddingStore:
                 self.vector_store = FAISS.load_local(
                     folder_path=self.faiss_folder_path, 
                     embeddings=self.embeddings_model,
-                    allow_dangerous_deserialization=True 
+                    allow_dangerous_deserialization=True,
+                    # LangChain warns "Normalizing L2 is not applicable" for this combination on every
+                    # load; that is expected, since it only checks for the Euclidean strategy
+                    normalize_L2=True,
+                    distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
                 )
                 print(f"FAISS index loaded from folder: {self.faiss_folder_path}")
                 return True
@@ -166,7 +287,7 @@ if __name__ == '__main__':
     # Define file paths
     # Ensure data/database_schema.sql exists from previous steps or create a dummy one.
     ddl_file = "data/database_schema.sql"
-    faiss_idx_folder = "data/context_faiss_store_v1" # Changed name for clarity
+    faiss_idx_folder = "data/context_faiss_store_v2" # The folder the app, main_pipeline and RAGContextProvider load
 
     # Create dummy DDL if it doesn't exist for demonstration
     if not os.path.exists(ddl_file):
@@ -185,7 +306,9 @@ if __name__ == '__main__':
             openai_api_key=openai_api_key,
             faiss_folder_path=faiss_idx_folder
         )
-        store_builder.build_and_save_store()
+        # An earlier run built the store from these exact inputs: load it instead of re-embedding
+        if not (read_store_key(faiss_idx_folder) == context_store_key() and store_builder.load_store()):
+            store_builder.build_and_save_store()
     except FileNotFoundError:
         print(f"Exiting due to DDL file not found issue during store building.")
         exit(1)
@@ -195,12 +318,19 @@ if __name__ == '__main__':
 
     print("\n--- Loading Store and Performing Search ---")
     try:
-        store_loader = QueryEmbeddingStore(
-            ddl_file_path=ddl_file, # DDL needed for generators, though not strictly for loading if pre-built
-            openai_api_key=openai_api_key,
-            faiss_folder_path=faiss_idx_folder
-        )
-        if store_loader.load_store():
+        # Set RAG_TEST_RELOAD=1 to exercise the save/load round trip with a second instance.
+        # By default the builder's in-memory store is reused, skipping a second CSV parse and index read.
+        if os.getenv("RAG_TEST_RELOAD") == "1":
+            store_loader = QueryEmbeddingStore(
+                ddl_file_path=ddl_file, # DDL needed for generators, though not strictly for loading if pre-built
+                openai_api_key=openai_api_key,
+                faiss_folder_path=faiss_idx_folder
+            )
+            store_loaded = store_loader.load_store()
+        else:
+            store_loader = store_builder
+            store_loaded = store_loader.vector_store is not None
+        if store_loaded:
             if store_loader.vector_store:
                 print("Performing a sample similarity search...")
                 try:
@@ -2,22 +2,25 @@ import os
 from dotenv import load_dotenv
 
 try:
-    from langchain_openai import OpenAIEmbeddings
+    import faiss
+    import numpy as np
     from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
     from langchain.schema import Document # For type hinting and if we need to construct Documents
 except ImportError:
     print("Langchain modules not fully available. Please ensure langchain, langchain_openai, langchain_community are installed.")
     # Define dummy classes for basic script structure to work if langchain is missing
-    class OpenAIEmbeddings:
-        def __init__(self, model, openai_api_key): pass
-        def embed_query(self, query_text): return [0.1] * 1536 # Dummy embedding
     class FAISS:
         @staticmethod
-        def load_local(folder_path, embeddings, allow_dangerous_deserialization): print(f"Dummy load from {folder_path}"); return FAISS()
+        def load_local(folder_path, embeddings, allow_dangerous_deserialization, **kwargs): print(f"Dummy load from {folder_path}"); return FAISS()
         def similarity_search_with_score(self, query, k): return []
+    class DistanceStrategy:
+        MAX_INNER_PRODUCT = "MAX_INNER_PRODUCT"
     class Document:
         def __init__(self, page_content, metadata): self.page_content = page_content; self.metadata = metadata
 
+from embeddings_utils import get_embeddings
+
 
 class QueryRetriever:
     """
@@ -33,7 +36,7 @@ class QueryRetriever:
         """
         self.faiss_index_folder_path = faiss_index_folder_path
         try:
-            self.embeddings_model = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=openai_api_key)
+            self.embeddings_model = get_embeddings(openai_api_key)
         except Exception as e:
             print(f"Error initializing OpenAIEmbeddings: {e}. Ensure OPENAI_API_KEY is valid.")
             self.embeddings_model = None # Or raise error
@@ -57,10 +60,16 @@ class QueryRetriever:
         index_file = os.path.join(self.faiss_index_folder_path, "index.faiss")
         if os.path.exists(index_file):
             try:
+                # The index is built with normalized vectors and inner-product search
+                # (see QueryEmbeddingStore), so queries must be normalized the same way.
                 self.vector_store = FAISS.load_local(
                     folder_path=self.faiss_index_folder_path, 
                     embeddings=self.embeddings_model,
-                    allow_dangerous_deserialization=True
+                    allow_dangerous_deserialization=True,
+                    # LangChain warns "Normalizing L2 is not applicable" for this combination on every
+                    # load; that is expected, since it only checks for the Euclidean strategy
+                    normalize_L2=True,
+                    distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
                 )
                 print(f"FAISS index loaded successfully from {self.faiss_index_folder_path}")
                 return True
@@ -99,19 +108,104 @@ class QueryRetriever:
             # query_embedding = self.embeddings_model.embed_query(user_question) 
             
             results = self.vector_store.similarity_search_with_score(query=user_question, k=k)
-            
-            formatted_results = []
-            for doc, score in results:
-                formatted_results.append({
-                    'content': doc.page_content,
-                    'metadata': doc.metadata,
-                    'score': float(score) # score is often distance, smaller is better for FAISS
-                })
-            return formatted_results
+            return self._format_results(results)
         except Exception as e:
             print(f"Error during similarity search: {e}")
             return []
 
+    def retrieve_relevant_documents_batch(self, user_questions: list[str], k: int = 5) -> list[list[dict]]:
+        """
+        Retrieves documents for several questions, embedding all of them with a
+        single embeddings request and searching the index with one batched call.
+
+        Args:
+            user_questions: The questions to find relevant documents for.
+            k: The number of top relevant documents to retrieve per question.
+
+        Returns:
+            One result list per question, in the same order as user_questions.
+        """
+        if self.vector_store is None:
+            print("Error: Vector store not loaded. Cannot retrieve.")
+            return [[] for _ in user_questions]
+        
+        if not self.embeddings_model:
+            print("Error: Embeddings model not available. Cannot retrieve.")
+            return [[] for _ in user_questions]
+
+        try:
+            query_embeddings = self.embeddings_model.embed_documents(user_questions)
+            return [self._format_results(results) for results in self._search_batch(query_embeddings, k)]
+        except Exception as e:
+            print(f"Error during batched similarity search: {e}")
+            return [[] for _ in user_questions]
+
+    def _search_batch(self, query_embeddings: list[list[float]], k: int) -> list[list[tuple]]:
+        """
+        Searches the FAISS index for all query vectors with a single index.search call.
+
+        Args:
+            query_embeddings: One embedding per query.
+            k: The number of neighbours to return per query.
+
+        Returns:
+            One list of (Document, score) pairs per query.
+        """
+        query_matrix = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        # The store is loaded with normalize_L2=True, so queries are normalized to match
+        faiss.normalize_L2(query_matrix)
+        scores, indices = self.vector_store.index.search(query_matrix, k)
+
+        batch_results = []
+        for row_scores, row_indices in zip(scores, indices):
+            results = []
+            for score, index_id in zip(row_scores, row_indices):
+                if index_id == -1: # Fewer than k vectors matched this query
+                    continue
+                doc_id = self.vector_store.index_to_docstore_id[index_id]
+                results.append((self.vector_store.docstore.search(doc_id), score))
+            batch_results.append(results)
+        return batch_results
+
+    async def aretrieve_relevant_documents(self, user_question: str, k: int = 5) -> list[dict]:
+        """
+        Async version of retrieve_relevant_documents, so retrievals for several
+        questions can overlap their embedding round trips.
+
+        Args:
+            user_question: The question to find relevant documents for.
+            k: The number of top relevant documents to retrieve.
+
+        Returns:
+            A list of dictionaries, where each dictionary contains 'content', 
+            'metadata', and 'score' of a retrieved document.
+        """
+        if self.vector_store is None:
+            print("Error: Vector store not loaded. Cannot retrieve.")
+            return []
+        
+        if not self.embeddings_model:
+            print("Error: Embeddings model not available. Cannot retrieve.")
+            return []
+
+        try:
+            results = await self.vector_store.asimilarity_search_with_score(query=user_question, k=k)
+            return self._format_results(results)
+        except Exception as e:
+            print(f"Error during similarity search: {e}")
+            return []
+
+    def _format_results(self, results) -> list[dict]:
+        """Converts (Document, score) pairs into the retriever's result dictionaries."""
+        formatted_results = []
+        for doc, score in results:
+            formatted_results.append({
+                'content': doc.page_content,
+                'metadata': doc.metadata,
+                'score': float(score) # Inner-product (cosine) similarity, larger is better
+            })
+        return formatted_results
+
 if __name__ == '__main__':
     load_dotenv() # Load environment variables from .env file
 
@@ -121,7 +215,7 @@ if __name__ == '__main__':
         exit(1)
 
     # This path should match the one used in query_embedding_store.py
-    faiss_path = "data/context_faiss_store_v1" 
+    faiss_path = "data/context_faiss_store_v2" 
 
     print(f"Attempting to load FAISS index from: {faiss_path}")
     try:
@@ -0,0 +1,16 @@
+import re
+from dataclasses import dataclass
+from typing import Tuple, FrozenSet
+
+_WORD_RE = re.compile(r'\w+')
+
+@dataclass(frozen=True)
+class QueryTokens:
+    """A user query tokenized once so keyword searches can share the work."""
+    terms: Tuple[str, ...]  # Lowercased words in query order (duplicates kept)
+    tokens: FrozenSet[str]
+
+def tokenize(query: str) -> QueryTokens:
+    """Lowercase and split a query into word tokens a single time."""
+    terms = tuple(_WORD_RE.findall(query.lower()))
+    return QueryTokens(terms=terms, tokens=frozenset(terms))
@@ -2,8 +2,8 @@ import os # Added import
 from csv_schema_loader import CSVSchemaLoader, TableInfo, ColumnInfo, JoinInfo
 # from schema_embedding_store import SchemaEmbeddingStore # Removed
 from query_retriever import QueryRetriever # Added import
-from typing import Dict, Any, List, Optional
-import re
+from query_tokens import QueryTokens, tokenize
+from typing import Dict, Any, List, Optional, Tuple, Union
 import logging # Added for logging warnings
 
 logger = logging.getLogger(__name__) # Added for logging warnings
@@ -15,6 +15,9 @@ class RAGContextProvider:
         """Initialize with CSVSchemaLoader."""
         self.csv_loader = CSVSchemaLoader(data_folder_path="data/")
         self.full_schema = self._get_full_schema_from_csv()
+        # (query, context) of the last lookup that retrieved documents; the explain and
+        # generate steps of one turn ask for the same query back to back.
+        self._last_context: Optional[Tuple[str, Dict[str, Any]]] = None
 
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if not openai_api_key:
@@ -25,7 +28,7 @@ class RAGContextProvider:
             # If QueryRetriever is robust to this (e.g. for loading a pre-built index without needing embeddings at init)
             # then this is just a warning. Given QueryRetriever init, it will likely fail if API key is bad/missing.
 
-        faiss_index_folder_path = "data/context_faiss_store_v1" 
+        faiss_index_folder_path = "data/context_faiss_store_v2" 
         
         try:
             self.query_retriever = QueryRetriever(
@@ -80,6 +83,13 @@ class RAGContextProvider:
 
     def get_relevant_context(self, query: str) -> Dict[str, Any]:
         logger.info(f"Starting get_relevant_context for query: '{query[:100]}...'")
+        # The provider is shared by every session, so read the slot once: another session
+        # may replace it between the comparison and the return
+        last_context = self._last_context
+        if last_context is not None and last_context[0] == query:
+            logger.info("Reusing relevant context from the previous lookup of the same query.")
+            return last_context[1]
+
         try:
             retrieved_docs = []
             if self.query_retriever:
@@ -104,43 +114,90 @@ class RAGContextProvider:
             else:
                 logger.warning("QueryRetriever not initialized. Cannot retrieve documents.")
             
-            logger.info("Searching CSV schema...")
-            relevant_schema_data = self._search_csv_schema(query)
-            logger.info(f"CSV schema search complete. Found {len(relevant_schema_data.get('tables', {}))} relevant tables.")
-
-            logger.info("Formatting relevant schema...")
-            formatted_context = self._format_relevant_schema(relevant_schema_data)
-            logger.info("Relevant schema formatting complete.")
-
-            logger.info("Formatting retrieved documents...")
-            statement_context = self._format_retrieved_documents(retrieved_docs)
-            logger.info("Retrieved documents formatting complete.")
-            
-            final_context = {
-                "relevant_schema": formatted_context, 
-                "relevant_statements": statement_context, 
-                "full_schema": self.full_schema,
-                "relevant_tables": list(relevant_schema_data["tables"].keys()) if relevant_schema_data and "tables" in relevant_schema_data else [],
-                "query_terms": self._extract_query_terms(query)
-            }
-            logger.info("Successfully prepared relevant context dictionary.")
+            final_context = self._build_context(query, retrieved_docs)
+            # QueryRetriever reports search errors as an empty result, so an empty retrieval is
+            # not cached: the next call for the same query retries it
+            if retrieved_docs:
+                self._last_context = (query, final_context)
             return final_context
 
         except Exception as e_main:
             # This is a catch-all for any unexpected error within get_relevant_context itself
             logger.error(f"CRITICAL UNHANDLED ERROR in get_relevant_context: {e_main}", exc_info=True)
-            # Return a minimal, safe dictionary to prevent further crashes downstream if possible
-            return {
-                "relevant_schema": "Error: Could not generate schema context.",
-                "relevant_statements": "Error: Could not generate statements.",
-                "full_schema": self.full_schema if hasattr(self, 'full_schema') else "Schema not available.",
-                "relevant_tables": [],
-                "query_terms": []
-            }
+            return self._error_context()
+
+    def get_relevant_context_batch(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get the relevant context for several queries at once.
+
+        All queries are embedded with a single embeddings request before searching,
+        instead of one request per query as with repeated get_relevant_context calls.
+
+        Returns:
+            One context dictionary per query, in the same order as the queries.
+        """
+        logger.info(f"Starting get_relevant_context_batch for {len(queries)} queries.")
+        retrieved_docs_per_query = [[] for _ in queries]
+        if self.query_retriever:
+            try:
+                retrieved_docs_per_query = self.query_retriever.retrieve_relevant_documents_batch(queries, k=5)
+                logger.info(f"Successfully retrieved documents for {len(queries)} queries from QueryRetriever.")
+            except Exception as e:
+                logger.error(f"Error during retrieve_relevant_documents_batch: {e}", exc_info=True)
+        else:
+            logger.warning("QueryRetriever not initialized. Cannot retrieve documents.")
+
+        contexts = []
+        for query, retrieved_docs in zip(queries, retrieved_docs_per_query):
+            try:
+                contexts.append(self._build_context(query, retrieved_docs))
+            except Exception as e_main:
+                logger.error(f"CRITICAL UNHANDLED ERROR in get_relevant_context_batch: {e_main}", exc_info=True)
+                contexts.append(self._error_context())
+        return contexts
+
+    def _build_context(self, query: str, retrieved_docs: List[Any]) -> Dict[str, Any]:
+        """Combine the CSV schema search for a query with its retrieved documents."""
+        # Tokenize once and share it between the keyword search and term extraction
+        query_tokens = tokenize(query)
+
+        logger.info("Searching CSV schema...")
+        relevant_schema_data = self._search_csv_schema(query_tokens)
+        logger.info(f"CSV schema search complete. Found {len(relevant_schema_data.get('tables', {}))} relevant tables.")
+
+        logger.info("Formatting relevant schema...")
+        formatted_context = self._format_relevant_schema(relevant_schema_data)
+        logger.info("Relevant schema formatting complete.")
+
+        logger.info("Formatting retrieved documents...")
+        statement_context = self._format_retrieved_documents(retrieved_docs)
+        logger.info("Retrieved documents formatting complete.")
+        
+        final_context = {
+            "relevant_schema": formatted_context, 
+            "relevant_statements": statement_context, 
+            "full_schema": self.full_schema,
+            "relevant_tables": list(relevant_schema_data["tables"].keys()) if relevant_schema_data and "tables" in relevant_schema_data else [],
+            "query_terms": self._extract_query_terms(query_tokens)
+        }
+        logger.info("Successfully prepared relevant context dictionary.")
+        return final_context
+
+    def _error_context(self) -> Dict[str, Any]:
+        """Return a minimal, safe dictionary to prevent further crashes downstream if possible."""
+        return {
+            "relevant_schema": "Error: Could not generate schema context.",
+            "relevant_statements": "Error: Could not generate statements.",
+            "full_schema": self.full_schema if hasattr(self, 'full_schema') else "Schema not available.",
+            "relevant_tables": [],
+            "query_terms": []
+        }
 
-    def _search_csv_schema(self, query: str) -> Dict[str, Any]:
+    def _search_csv_schema(self, query: Union[str, QueryTokens]) -> Dict[str, Any]:
         """Mimics search_schema using CSVSchemaLoader."""
-        query_terms = {term.lower() for term in re.findall(r'\b\w+\b', query)}
+        if isinstance(query, str):
+            query = tokenize(query)
+        query_terms = query.tokens
         
         relevant_tables_data = {}
         all_identified_table_names = set()
@@ -286,12 +343,14 @@ class RAGContextProvider:
 
         return "\n\n".join(formatted_parts)
 
-    def _extract_query_terms(self, query: str) -> List[str]:
+    def _extract_query_terms(self, query: Union[str, QueryTokens]) -> List[str]:
         """Extract key terms from the query."""
+        if isinstance(query, str):
+            query = tokenize(query)
         # Remove common words and keep potential database-related terms
         common_words = {"the", "a", "an", "in", "on", "at", "by", "for", "with", "about", "from", "to", "of"}
-        terms = [term.lower() for term in re.findall(r'\b\w+\b', query) 
-                if term.lower() not in common_words and len(term) > 2]
+        terms = [term for term in query.terms
+                if term not in common_words and len(term) > 2]
         return terms
     
     def get_table_info(self) -> Dict[str, List[Dict[str, str]]]:
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from typing import Optional
 
 try:
     from langchain_openai import ChatOpenAI
@@ -12,6 +13,7 @@ except ImportError:
     class ChatOpenAI:
         def __init__(self, model_name, openai_api_key, temperature): pass
         def invoke(self, messages): return type('obj', (object,), {'content': '-- Dummy SQL Query'})() # Dummy response
+        async def ainvoke(self, messages): return self.invoke(messages)
     class ChatPromptTemplate:
         @staticmethod
         def from_messages(messages_list): return ChatPromptTemplate()
@@ -95,15 +97,68 @@ class RAGSQLGenerator:
             return "-- LLM not initialized"
 
         if self.query_retriever.vector_store is None:
+            retrieved_docs = None
+        else:
+            retrieved_docs = self.query_retriever.retrieve_relevant_documents(user_question, k=k_retrieved_items)
+
+        try:
+            messages = self._build_messages(user_question, retrieved_docs)
+            response = self.llm.invoke(messages)
+            return self._clean_sql(response.content)
+
+        except Exception as e:
+            print(f"Error during LLM invocation or prompt formatting: {e}")
+            return "-- Error generating SQL query"
+
+    async def agenerate_sql_query(self, user_question: str, k_retrieved_items: int = 5) -> str:
+        """
+        Async version of generate_sql_query. Awaiting several of these with
+        asyncio.gather overlaps their retrieval and LLM round trips.
+
+        Args:
+            user_question: The user's natural language question.
+            k_retrieved_items: The number of items to retrieve from the vector store.
+
+        Returns:
+            The generated SQL query string.
+        """
+        if self.llm is None:
+            print("Error: LLM not initialized. Cannot generate SQL query.")
+            return "-- LLM not initialized"
+
+        if self.query_retriever.vector_store is None:
+            retrieved_docs = None
+        else:
+            retrieved_docs = await self.query_retriever.aretrieve_relevant_documents(user_question, k=k_retrieved_items)
+
+        try:
+            messages = self._build_messages(user_question, retrieved_docs)
+            response = await self.llm.ainvoke(messages)
+            return self._clean_sql(response.content)
+
+        except Exception as e:
+            print(f"Error during LLM invocation or prompt formatting: {e}")
+            return "-- Error generating SQL query"
+
+    def _build_messages(self, user_question: str, retrieved_docs: Optional[list[dict]]) -> list:
+        """
+        Builds the chat messages for SQL generation.
+
+        Args:
+            user_question: The user's natural language question.
+            retrieved_docs: Documents from the retriever, or None if no vector store is loaded.
+
+        Returns:
+            The formatted list of chat messages.
+        """
+        if retrieved_docs is None:
             print("Warning: Vector store not available. Proceeding without RAG context (this may lead to poor results).")
             formatted_context = "No RAG context available due to missing vector store."
+        elif not retrieved_docs:
+            print("Warning: No relevant documents found in vector store for the question. Query will be generated without specific RAG context.")
+            formatted_context = "No specific RAG context found for this question."
         else:
-            retrieved_docs = self.query_retriever.retrieve_relevant_documents(user_question, k=k_retrieved_items)
-            if not retrieved_docs:
-                print("Warning: No relevant documents found in vector store for the question. Query will be generated without specific RAG context.")
-                formatted_context = "No specific RAG context found for this question."
-            else:
-                formatted_context = self._format_retrieved_context(retrieved_docs)
+            formatted_context = self._format_retrieved_context(retrieved_docs)
 
         system_template = """
 You are an expert SQL generation assistant. Your task is to generate a syntactically correct SQL query that answers the user's question.
@@ -119,29 +174,20 @@ Database Schema and Examples:
 """
         human_template = "User Question: {question}"
 
-        try:
-            chat_prompt = ChatPromptTemplate.from_messages([
-                ("system", system_template),
-                ("human", human_template)
-            ])
-            
-            messages = chat_prompt.format_messages(context=formatted_context, question=user_question)
-            
-            response = self.llm.invoke(messages)
-            sql_query = response.content
-            
-            # Strip potential markdown backticks and leading/trailing whitespace
-            if sql_query.startswith("```sql"):
-                sql_query = sql_query[len("```sql"):]
-            if sql_query.endswith("```"):
-                sql_query = sql_query[:-len("```")]
-            sql_query = sql_query.strip()
-            
-            return sql_query
+        chat_prompt = ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", human_template)
+        ])
+        
+        return chat_prompt.format_messages(context=formatted_context, question=user_question)
 
-        except Exception as e:
-            print(f"Error during LLM invocation or prompt formatting: {e}")
-            return "-- Error generating SQL query"
+    def _clean_sql(self, sql_query: str) -> str:
+        """Strips potential markdown backticks and leading/trailing whitespace from the LLM output."""
+        if sql_query.startswith("```sql"):
+            sql_query = sql_query[len("```sql"):]
+        if sql_query.endswith("```"):
+            sql_query = sql_query[:-len("```")]
+        return sql_query.strip()
 
 
 if __name__ == '__main__':
@@ -153,7 +199,7 @@ if __name__ == '__main__':
         exit(1)
 
     # This path should match the one used in query_embedding_store.py and query_retriever.py
-    faiss_path = "data/context_faiss_store_v1" 
+    faiss_path = "data/context_faiss_store_v2" 
     # Ensure this path exists and contains the FAISS index.
     # If not, query_retriever will print a warning, and RAG will be limited.
 
@@ -1,6 +1,55 @@
 import re
 import os
-from typing import Dict, List, Any, Optional
+import mmap
+import functools
+from typing import Dict, List, Any, Optional, NamedTuple, Tuple, Union
+from query_tokens import QueryTokens, tokenize
+
+# Helper regex for names (allows for brackets, spaces, dots)
+# Original simpler one for single word names like columns: r'\[?(\w+)\]?'
+_CAPTURE_NAME_SG = r'\[?([\w\.]+)\]?' # Allowing dots for simple names e.g. column_name or schema.column_name
+_CAPTURE_NAME_MG = r'(?:\[([\w\s\.]+)\]|([\w\s\.]+))' # For complex names like tables [dbo.My Table] or dbo.MyTable
+
+# Statement-level patterns, compiled twice from the same source. The bytes forms run directly
+# over the mmap'd DDL file; in bytes mode \w and \s are ASCII-only, so a file containing any
+# non-ASCII byte is decoded and scanned with the str forms instead (see SchemaParser._parse).
+# CREATE TABLE <name> (<body>); -- groups: 1 bracketed name, 2 plain name, 3 body
+# Original: r'CREATE TABLE\s+\[?(\w+)\]?\s*\(([\s\S]*?)\);'
+_CREATE_TABLE_PATTERN = fr'CREATE TABLE\s+{_CAPTURE_NAME_MG}\s*\(([\s\S]*?)\);'
+# ALTER TABLE <source> ADD [CONSTRAINT <name>] FOREIGN KEY (<column>) REFERENCES <target> (<column>)
+# Original: r'ALTER TABLE\s+\[?(\w+)\]?\s+ADD\s+(?:CONSTRAINT\s+\[?\w+\]?\s+)?FOREIGN KEY\s*\(\s*\[?(\w+)\]?\s*\)\s+REFERENCES\s+\[?(\w+)\]?\s*\(\s*\[?(\w+)\]?\s*\)'
+_ALTER_FK_PATTERN = fr'ALTER TABLE\s+{_CAPTURE_NAME_MG}\s+ADD\s+(?:CONSTRAINT\s+\[?\w+\]?\s+)?FOREIGN KEY\s*\(\s*{_CAPTURE_NAME_SG}\s*\)\s*REFERENCES\s+{_CAPTURE_NAME_MG}\s*\(\s*{_CAPTURE_NAME_SG}\s*\)'
+_CREATE_TABLE_RE = re.compile(_CREATE_TABLE_PATTERN.encode(), re.IGNORECASE | re.MULTILINE)
+_ALTER_FK_RE = re.compile(_ALTER_FK_PATTERN.encode(), re.IGNORECASE | re.MULTILINE)
+_CREATE_TABLE_STR_RE = re.compile(_CREATE_TABLE_PATTERN, re.IGNORECASE | re.MULTILINE)
+_ALTER_FK_STR_RE = re.compile(_ALTER_FK_PATTERN, re.IGNORECASE | re.MULTILINE)
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+# Single pass over a CREATE TABLE body: each match is either an inline foreign key
+# constraint (fk) or a column definition (col). The fk branch is tried first, so a
+# constraint line is never also read as a column.
+# fk: CONSTRAINT <name> FOREIGN KEY (<fk_column>) REFERENCES <fk_target_b|fk_target> (<fk_target_column>)
+# col: ^\s*, then the column name (name_b bracketed or name, allows spaces and dots), whitespace,
+#      the data type (base type, optional numeric attributes, character set/collation), then
+#      non-greedily the rest of the definition until a comma, closing parenthesis, or end of line.
+_DDL_BODY_RE = re.compile(
+    r"\s*(?P<fk>CONSTRAINT\s+\[?\w+\]?\s+FOREIGN KEY\s*\(\s*\[?(?P<fk_column>[\w\.]+)\]?\s*\)"
+    r"\s*REFERENCES\s+(?:\[(?P<fk_target_b>[\w\s\.]+)\]|(?P<fk_target>[\w\s\.]+))"
+    r"\s*\(\s*\[?(?P<fk_target_column>[\w\.]+)\]?\s*\))"
+    r"|(?P<col>^\s*"
+    r"(?:\[(?P<name_b>[\w\s\.]+)\]|(?P<name>[\w\s\.]+))"
+    r"\s+"
+    r"(?P<type>\w+(?:\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(?:\s*(?:UNSIGNED|ZEROFILL))?(?:\s*CHARACTER\s+SET\s+[\w]+)?(?:\s*COLLATE\s+[\w_]+)?)"
+    r"(?:.*?(?:,|\)|$)))",
+    re.IGNORECASE | re.MULTILINE
+)
+
+class Rel(NamedTuple):
+    """A foreign key relationship between two table columns."""
+    source_table: str
+    source_column: str
+    target_table: str
+    target_column: str
 
 class SchemaParser:
     """Parse SQL DDL files to extract schema information."""
@@ -8,105 +57,98 @@ class SchemaParser:
     def __init__(self, ddl_file_path: str):
         """Initialize with the path to the DDL file."""
         self.ddl_file_path = ddl_file_path
-        self.tables = {}
-        self.relationships = []
-        self._parse_ddl()
-    
-    def _parse_ddl(self):
-        """Parse the DDL file to extract table and column information."""
         if not os.path.exists(self.ddl_file_path):
             raise FileNotFoundError(f"DDL file not found: {self.ddl_file_path}")
-        
-        with open(self.ddl_file_path, 'r') as f:
-            ddl_content = f.read()
-        
-        # Helper regex for names (allows for brackets, spaces, dots)
-        # capture_name_sg = r'\[?(\w+)\]?' # Original simpler one for single word names like columns
-        capture_name_sg = r'\[?([\w\.]+)\]?' # Allowing dots for simple names e.g. column_name or schema.column_name
-        capture_name_mg = r'(?:\[([\w\s\.]+)\]|([\w\s\.]+))' # For complex names like tables [dbo.My Table] or dbo.MyTable
+        self._artifacts_cache: Optional[Tuple[str, List[Dict[str, Any]]]] = None
+        # Parsers for an unchanged file share one parse (the parsed structures are treated as read-only)
+        ddl_stat = os.stat(self.ddl_file_path)
+        self.tables, self.relationships = _load_parsed(self.ddl_file_path, ddl_stat.st_mtime_ns, ddl_stat.st_size)
+        # The schema is immutable after parsing, so lowercase names once for search_schema
+        self._lower_table_names: List[Tuple[str, str]] = [(t.lower(), t) for t in self.tables]
+        self._lower_col_names: Dict[str, List[str]] = {
+            t: [c['name'].lower() for c in data['columns']] for t, data in self.tables.items()
+        }
+    
+    @staticmethod
+    def _parse(ddl_file_path: str) -> Tuple[Dict[str, Any], List[Rel]]:
+        """Parse the DDL file to extract table, column and relationship information."""
+        tables = {}
+        relationships: List[Rel] = []
+
+        if os.path.getsize(ddl_file_path) == 0:
+            return tables, relationships # mmap cannot map an empty file
+
+        # Map the file read-only and run the statement-level patterns directly over its bytes,
+        # so the whole DDL is never copied into a str; only matched pieces are decoded.
+        with open(ddl_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as ddl_content:
+            if _NON_ASCII_RE.search(ddl_content):
+                # Non-ASCII names or whitespace (e.g. Café, NBSP) need the Unicode \w and \s of str patterns
+                return SchemaParser._parse_content(
+                    ddl_content[:].decode('utf-8'), _CREATE_TABLE_STR_RE, _ALTER_FK_STR_RE, tables, relationships
+                )
+            return SchemaParser._parse_content(ddl_content, _CREATE_TABLE_RE, _ALTER_FK_RE, tables, relationships)
+
+    @staticmethod
+    def _parse_content(ddl_content: Union[str, mmap.mmap], create_table_re: re.Pattern, alter_fk_re: re.Pattern,
+                       tables: Dict[str, Any], relationships: List[Rel]) -> Tuple[Dict[str, Any], List[Rel]]:
+        """Scan the DDL with the given statement patterns, filling tables and relationships."""
+        def decode(value: Union[bytes, str, None]) -> Optional[str]:
+            return value.decode('utf-8') if isinstance(value, bytes) else value
 
         # Extract CREATE TABLE statements
-        # table_pattern = r'CREATE TABLE\s+\[?(\w+)\]?\s*\(([\s\S]*?)\);' # Original
-        table_pattern = fr'CREATE TABLE\s+{capture_name_mg}\s*\(([\s\S]*?)\);'
-        table_matches = re.finditer(table_pattern, ddl_content, re.IGNORECASE | re.MULTILINE)
+        table_matches = create_table_re.finditer(ddl_content)
         
         for match in table_matches:
-            table_name = match.group(1) or match.group(2) # Group 1 for bracketed, Group 2 for non-bracketed
-            columns_text = match.group(3) # Content of the table definition
+            table_name = decode(match.group(1) or match.group(2)) # Group 1 for bracketed, Group 2 for non-bracketed
+            columns_text = decode(match.group(3)) # Content of the table definition
             
-            # Extract columns
+            # Extract columns and inline foreign key constraints in a single scan of the body
             columns = []
-            # New robust column pattern
-            # Explanation:
-            # ^\s*: Matches the beginning of a line/segment.
-            # (?:\[(?P<name_b>[\w\s\.]+)\]|(?P<name>[\w\s\.]+)): Named groups name_b (bracketed) or name (non-bracketed) for the column name. Allows spaces and dots.
-            # \s+: Separator.
-            # (?P<type>\w+(?:\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(?:\s*(?:UNSIGNED|ZEROFILL))?(?:\s*CHARACTER\s+SET\s+[\w]+)?(?:\s*COLLATE\s+[\w_]+)?): Named group type. Captures base type, optional numeric attributes, and optional character set/collation.
-            # (?:.*?(?:,|\)|$)): Non-greedily consumes any characters until comma, closing parenthesis, or end of string/line.
-            new_column_pattern = re.compile(
-                r"^\s*"                                      # Start of a line or segment
-                r"(?:\[(?P<name_b>[\w\s\.]+)\]|(?P<name>[\w\s\.]+))"  # Column name (bracketed or not, allows spaces and dots)
-                r"\s+"                                       # Whitespace after name
-                r"(?P<type>\w+(?:\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(?:\s*(?:UNSIGNED|ZEROFILL))?(?:\s*CHARACTER\s+SET\s+[\w]+)?(?:\s*COLLATE\s+[\w_]+)?)"  # Data type
-                r"(?:.*?(?:,|\)|$))",                         # Non-greedily consume the rest until a comma or end of definition block
-                re.IGNORECASE | re.MULTILINE
-            )
+            for body_match in _DDL_BODY_RE.finditer(columns_text):
+                if body_match.group('fk') is not None:
+                    target_table = body_match.group('fk_target_b') or body_match.group('fk_target')
+                    relationships.append(Rel(
+                        table_name, # Current table being processed
+                        body_match.group('fk_column'),
+                        target_table,
+                        body_match.group('fk_target_column')
+                    ))
+                    continue
 
-            for col_match in new_column_pattern.finditer(columns_text):
-                name_b = col_match.group('name_b')
-                name_val = col_match.group('name') # Renamed 'name' to 'name_val' to avoid conflict with 'name' in columns.append
+                name_b = body_match.group('name_b')
+                name_val = body_match.group('name') # Renamed 'name' to 'name_val' to avoid conflict with 'name' in columns.append
                 column_name = name_b if name_b else name_val
-                column_type = col_match.group('type')
+                column_type = body_match.group('type')
                 
                 if column_name and column_type: # Ensure essential parts were captured
                      columns.append({"name": column_name.strip(), "type": column_type.strip()})
             
-            self.tables[table_name] = {"columns": columns} # Store columns under a 'columns' key
-
-            # Parse inline foreign key constraints within the CREATE TABLE statement
-            # inline_fk_pattern = r'CONSTRAINT\s+\[?(\w+)\]?\s+FOREIGN KEY\s*\(\s*\[?(\w+)\]?\s*\)\s*REFERENCES\s+\[?(\w+)\]?\s*\(\s*\[?(\w+)\]?\s*\)' # Original
-            inline_fk_pattern = fr'CONSTRAINT\s+\[?\w+\]?\s+FOREIGN KEY\s*\(\s*{capture_name_sg}\s*\)\s*REFERENCES\s+{capture_name_mg}\s*\(\s*{capture_name_sg}\s*\)'
-            inline_fk_matches = re.finditer(inline_fk_pattern, columns_text, re.IGNORECASE | re.MULTILINE)
-            for fk_match in inline_fk_matches:
-                # fk_match.group(0) is the full match
-                # fk_match.group(1) is source_column from capture_name_sg
-                # fk_match.group(2) is target_table (bracketed part of capture_name_mg)
-                # fk_match.group(3) is target_table (non-bracketed part of capture_name_mg)
-                # fk_match.group(4) is target_column from capture_name_sg
-                source_column = fk_match.group(1)
-                target_table = fk_match.group(2) or fk_match.group(3)
-                target_column = fk_match.group(4)
-                self.relationships.append({
-                    "source_table": table_name, # Current table being processed
-                    "source_column": source_column,
-                    "target_table": target_table,
-                    "target_column": target_column
-                })
+            tables[table_name] = {"columns": columns} # Store columns under a 'columns' key
         
         # Extract foreign key relationships defined with ALTER TABLE
-        # alter_fk_pattern = r'ALTER TABLE\s+\[?(\w+)\]?\s+ADD\s+(?:CONSTRAINT\s+\[?\w+\]?\s+)?FOREIGN KEY\s*\(\s*\[?(\w+)\]?\s*\)\s+REFERENCES\s+\[?(\w+)\]?\s*\(\s*\[?(\w+)\]?\s*\)' #Original
-        alter_fk_pattern = fr'ALTER TABLE\s+{capture_name_mg}\s+ADD\s+(?:CONSTRAINT\s+\[?\w+\]?\s+)?FOREIGN KEY\s*\(\s*{capture_name_sg}\s*\)\s*REFERENCES\s+{capture_name_mg}\s*\(\s*{capture_name_sg}\s*\)'
-        alter_fk_matches = re.finditer(alter_fk_pattern, ddl_content, re.IGNORECASE | re.MULTILINE)
+        alter_fk_matches = alter_fk_re.finditer(ddl_content)
         
         for fk_match in alter_fk_matches: # Renamed match to fk_match for clarity
             # fk_match.group(0) is the full match
-            # fk_match.group(1) is source_table (bracketed part of capture_name_mg for ALTER TABLE)
-            # fk_match.group(2) is source_table (non-bracketed part of capture_name_mg for ALTER TABLE)
-            # fk_match.group(3) is source_column from capture_name_sg
-            # fk_match.group(4) is target_table (bracketed part of capture_name_mg for REFERENCES)
-            # fk_match.group(5) is target_table (non-bracketed part of capture_name_mg for REFERENCES)
-            # fk_match.group(6) is target_column from capture_name_sg
-            source_table = fk_match.group(1) or fk_match.group(2)
-            source_column = fk_match.group(3)
-            target_table = fk_match.group(4) or fk_match.group(5)
-            target_column = fk_match.group(6)
+            # fk_match.group(1) is source_table (bracketed part of _CAPTURE_NAME_MG for ALTER TABLE)
+            # fk_match.group(2) is source_table (non-bracketed part of _CAPTURE_NAME_MG for ALTER TABLE)
+            # fk_match.group(3) is source_column from _CAPTURE_NAME_SG
+            # fk_match.group(4) is target_table (bracketed part of _CAPTURE_NAME_MG for REFERENCES)
+            # fk_match.group(5) is target_table (non-bracketed part of _CAPTURE_NAME_MG for REFERENCES)
+            # fk_match.group(6) is target_column from _CAPTURE_NAME_SG
+            source_table = decode(fk_match.group(1) or fk_match.group(2))
+            source_column = decode(fk_match.group(3))
+            target_table = decode(fk_match.group(4) or fk_match.group(5))
+            target_column = decode(fk_match.group(6))
 
-            self.relationships.append({
-                "source_table": source_table.strip(), # Added strip just in case
-                "source_column": source_column.strip(),
-                "target_table": target_table.strip(),
-                "target_column": target_column.strip()
-            })
+            relationships.append(Rel(
+                source_table.strip(), # Added strip just in case
+                source_column.strip(),
+                target_table.strip(),
+                target_column.strip()
+            ))
+
+        return tables, relationships
     
     def get_table_info(self) -> Dict[str, Any]:
         """Get information about all tables and their columns."""
@@ -130,40 +172,101 @@ class SchemaParser:
             "relationships": self.relationships
         }
     
-    def get_formatted_schema(self) -> str:
-        """Get a formatted string representation of the schema."""
-        schema_str = "Database Schema:\n\n"
+    def build_artifacts(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Walk the parsed schema once and build both the formatted schema string
+        and the list of elements for embedding. The result is cached, since the
+        schema is immutable after parsing.
+
+        Returns:
+            A (formatted_schema, elements) tuple. Each element is a dict with
+            'content' and 'metadata' keys.
+        """
+        if self._artifacts_cache is not None:
+            return self._artifacts_cache
+
+        parts = ["Database Schema:\n\n"]
+        elements: List[Dict[str, Any]] = []
         
         for table_name, table_data in self.tables.items():
-            schema_str += f"Table: {table_name}\n"
+            parts.append(f"Table: {table_name}\n")
+            column_descs = []
+            column_elements = []
             for column in table_data['columns']: # Access columns via table_data['columns']
-                schema_str += f"  - {column['name']} ({column['type']})\n"
-            schema_str += "\n"
+                column_desc = f"{column['name']} ({column['type']})"
+                parts.append(f"  - {column_desc}\n")
+                column_descs.append(column_desc)
+                column_elements.append({
+                    "content": f"Column '{column['name']}' in table '{table_name}' (Type: {column['type']}).",
+                    "metadata": {"type": "column", "table_name": table_name, "column_name": column['name']}
+                })
+            parts.append("\n")
+            elements.append({
+                "content": f"Table '{table_name}' contains columns: {', '.join(column_descs)}",
+                "metadata": {"type": "table", "table_name": table_name}
+            })
+            elements.extend(column_elements)
         
         if self.relationships:
-            schema_str += "Relationships:\n"
+            parts.append("Relationships:\n")
             for rel in self.relationships:
-                schema_str += f"  - {rel['source_table']}.{rel['source_column']} -> {rel['target_table']}.{rel['target_column']}\n"
+                rel_str = f"{rel.source_table}.{rel.source_column} -> {rel.target_table}.{rel.target_column}"
+                parts.append(f"  - {rel_str}\n")
+                elements.append({
+                    "content": f"Relationship: {rel_str}",
+                    "metadata": {"type": "relationship", **rel._asdict()}
+                })
         
-        return schema_str
+        self._artifacts_cache = ("".join(parts), elements)
+        return self._artifacts_cache
+
+    def get_formatted_schema(self) -> str:
+        """Get a formatted string representation of the schema."""
+        return self.build_artifacts()[0]
+
+    def get_elements_for_embedding(self) -> List[Dict[str, Any]]:
+        """Get the table, column and relationship elements to embed into a vector store."""
+        return self.build_artifacts()[1]
+
+    def get_embedding_payload(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Get the embedding elements split into parallel content and metadata lists.
+
+        Callers should embed all contents in a single batched call (e.g.
+        embed_documents(contents) or model.encode(contents, batch_size=64))
+        instead of encoding elements one at a time, then add the vectors to
+        the index in the same order as the metadatas.
+
+        Returns:
+            A (contents, metadatas) tuple in matching order.
+        """
+        elements = self.get_elements_for_embedding()
+        contents = [element["content"] for element in elements]
+        metadatas = [element["metadata"] for element in elements]
+        return contents, metadatas
     
-    def search_schema(self, query: str) -> Dict[str, Any]:
-        """Search the schema for relevant tables and columns based on a query."""
-        query_terms = set(re.findall(r'\b\w+\b', query.lower()))
+    def search_schema(self, query: Union[str, QueryTokens]) -> Dict[str, Any]:
+        """Search the schema for relevant tables and columns based on a query.
+
+        Accepts either the raw query string or a QueryTokens built by tokenize().
+        """
+        if isinstance(query, str):
+            query = tokenize(query)
+        query_terms = query.tokens
         
         relevant_tables = {}
         relevant_relationships = []
         
         # Find relevant tables and columns
-        for table_name, table_data in self.tables.items():
-            columns = table_data['columns'] # Access columns via table_data['columns']
-            if table_name.lower() in query_terms:
+        for table_name_lower, table_name in self._lower_table_names:
+            columns = self.tables[table_name]['columns'] # Access columns via table_data['columns']
+            if table_name_lower in query_terms:
                 relevant_tables[table_name] = columns # Store the list of columns
                 continue
                 
             relevant_columns_list = [] # Renamed to avoid confusion
-            for column in columns:
-                if column['name'].lower() in query_terms:
+            for column, column_name_lower in zip(columns, self._lower_col_names[table_name]):
+                if column_name_lower in query_terms:
                     relevant_columns_list.append(column)
             
             if relevant_columns_list:
@@ -185,20 +288,20 @@ class SchemaParser:
             for term in query_terms:
                 for key, values in semantic_matches.items():
                     if term in values or key == term:
-                        for table_name, table_data_loop in self.tables.items(): # Changed 'table_data' to 'table_data_loop' to avoid conflict
-                            if key in table_name.lower():
-                                relevant_tables[table_name] = table_data_loop['columns'] # Corrected indentation and variable
+                        for table_name_lower, table_name in self._lower_table_names:
+                            if key in table_name_lower:
+                                relevant_tables[table_name] = self.tables[table_name]['columns']
         
         # Find relationships involving the relevant tables
         for rel in self.relationships:
-            if rel['source_table'] in relevant_tables or rel['target_table'] in relevant_tables:
+            if rel.source_table in relevant_tables or rel.target_table in relevant_tables:
                 relevant_relationships.append(rel)
                 
                 # Add the related tables if they're not already included
-                if rel['source_table'] not in relevant_tables:
-                    relevant_tables[rel['source_table']] = self.tables[rel['source_table']]['columns']
-                if rel['target_table'] not in relevant_tables:
-                    relevant_tables[rel['target_table']] = self.tables[rel['target_table']]['columns']
+                if rel.source_table not in relevant_tables:
+                    relevant_tables[rel.source_table] = self.tables[rel.source_table]['columns']
+                if rel.target_table not in relevant_tables:
+                    relevant_tables[rel.target_table] = self.tables[rel.target_table]['columns']
         
         # If still no tables found, return a subset of the schema
         if not relevant_tables and self.tables:
@@ -213,6 +316,11 @@ class SchemaParser:
             "relationships": relevant_relationships
         }
 
+@functools.lru_cache(maxsize=4)
+def _load_parsed(ddl_file_path: str, mtime_ns: int, size: int) -> Tuple[Dict[str, Any], List[Rel]]:
+    """Parse a DDL file once per (path, mtime, size), so re-creating a parser for an unchanged file is free."""
+    return SchemaParser._parse(ddl_file_path)
+
 if __name__ == '__main__':
     # Use the actual DDL file if it exists, otherwise create/use the dummy one.
     actual_ddl_path = 'data/database_schema.sql'
@@ -245,28 +353,35 @@ if __name__ == '__main__':
     try:
         print(f"Parsing schema from: {actual_ddl_path}")
         parser = SchemaParser(actual_ddl_path)
+        # Set SCHEMA_DEBUG=1 to list every parsed table, column and relationship.
+        # By default only the counts are printed, which keeps output small for large DDLs.
+        verbose = os.getenv("SCHEMA_DEBUG") == "1"
         
-        print("\n--- Parsed Tables ---")
-        for table_name, data in parser.tables.items():
-            print(f"Table: {table_name}")
-            for col in data['columns']:
-                print(f"  - {col['name']} ({col['type']})")
-        
-        print("\n--- Parsed Relationships (Foreign Keys) ---")
-        if parser.relationships:
-            for rel in parser.relationships:
-                print(f"  - {rel['source_table']}.{rel['source_column']} -> {rel['target_table']}.{rel['target_column']}")
+        if verbose:
+            print("\n--- Parsed Tables ---")
+            for table_name, data in parser.tables.items():
+                print(f"Table: {table_name}")
+                for col in data['columns']:
+                    print(f"  - {col['name']} ({col['type']})")
+            
+            print("\n--- Parsed Relationships (Foreign Keys) ---")
+            if parser.relationships:
+                for rel in parser.relationships:
+                    print(f"  - {rel.source_table}.{rel.source_column} -> {rel.target_table}.{rel.target_column}")
+            else:
+                print("  No relationships found.")
         else:
-            print("  No relationships found.")
+            print(f"\nParsed {len(parser.tables)} tables, {len(parser.relationships)} relationships (set SCHEMA_DEBUG=1 for details).")
 
         # Specifically checking for Claims table relationships as per requirements
         print("\n--- Checking 'dbo.Claims' Table Relationships (and other complex names) ---")
         claims_rels_found_count = 0
         for rel in parser.relationships:
             # Check for claims, and also test if complex names like dbo.Products are parsed correctly
-            if 'claims' in rel['source_table'].lower() or 'products' in rel['source_table'].lower() or 'orders' in rel['source_table'].lower():
-                print(f"  Found: {rel['source_table']}.{rel['source_column']} -> {rel['target_table']}.{rel['target_column']}")
-                if 'claims' in rel['source_table'].lower():
+            if 'claims' in rel.source_table.lower() or 'products' in rel.source_table.lower() or 'orders' in rel.source_table.lower():
+                if verbose:
+                    print(f"  Found: {rel.source_table}.{rel.source_column} -> {rel.target_table}.{rel.target_column}")
+                if 'claims' in rel.source_table.lower():
                     claims_rels_found_count +=1
         
         if claims_rels_found_count == 0:
@@ -34,13 +34,16 @@ st.set_page_config(
     layout="wide"
 )
 
+# Read the debug flag once per rerun for the status messages below
+debug_enabled = st.session_state.get("show_debug", False)
+
 # Try to import from graph_builder, but fall back to legacy mode if it fails
 try:
     from graph_builder import build_simple_graph
     USE_LANGGRAPH = True
     
     # Only show success messages in debug mode
-    if st.session_state.get("show_debug", False):
+    if debug_enabled:
         st.success("Successfully imported LangGraph components")
 except ImportError as e:
     USE_LANGGRAPH = False
@@ -51,11 +54,22 @@ except ImportError as e:
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "db_path" not in st.session_state:
-    st.session_state.db_path = initialize_database()
+@st.cache_resource
+def _load_db_path():
+    """Initialize the database once per process and share it across sessions."""
+    return initialize_database()
+
+@st.cache_resource
+def _load_table_info():
+    """
+    Load table info once per process and share it across sessions.
+    It comes from the process-wide RAGContextProvider, which reads the schema CSVs once,
+    so picking up CSV changes needs an app restart (or clearing this cache and the provider).
+    """
+    return get_table_info()
 
-if "table_info" not in st.session_state:
-    st.session_state.table_info = get_table_info()
+st.session_state.db_path = _load_db_path()
+st.session_state.table_info = _load_table_info()
 
 # Initialize LangGraph related session state variables if available
 if USE_LANGGRAPH:
@@ -65,7 +79,7 @@ if USE_LANGGRAPH:
             st.session_state.graph = build_simple_graph().compile()
             
             # Only show success message in debug mode
-            if st.session_state.get("show_debug", False):
+            if debug_enabled:
                 st.success("Using simplified LangGraph with feedback support")
             
             # Reset all graph-related state
@@ -98,12 +112,13 @@ if USE_LANGGRAPH:
         st.error("OPENAI_API_KEY environment variable not set. LangGraph will not work without it.")
     else:
         # Only show success message in debug mode
-        if st.session_state.get("show_debug", False):
+        if debug_enabled:
             st.success(f"OPENAI_API_KEY is set (starts with {openai_api_key[:4]}...)")
 
 # --- FAISS Index Check ---
 # This path should be consistent with where main_pipeline.py and query_embedding_store.py save the index.
-FAISS_INDEX_FOLDER_PATH = "data/context_faiss_store_v1"
+# v2: normalized vectors with inner-product search; a v1 (flat L2) index is not read, so it gets rebuilt.
+FAISS_INDEX_FOLDER_PATH = "data/context_faiss_store_v2"
 faiss_actual_index_file = os.path.join(FAISS_INDEX_FOLDER_PATH, "index.faiss")
 
 if not os.path.exists(faiss_actual_index_file):
@@ -206,7 +221,7 @@ if USE_LANGGRAPH:
 # Display feedback buttons if awaiting feedback
 if USE_LANGGRAPH:
     # Add debug info about the awaiting_feedback state
-    print(f"Awaiting feedback state: {st.session_state.awaiting_feedback}")
+    logger.debug("Awaiting feedback state: %s", st.session_state.awaiting_feedback)
     
     display_feedback_buttons(
         st.session_state.awaiting_feedback,
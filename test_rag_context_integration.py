@@ -81,4 +81,33 @@ except Exception as e:
     print(f"FAILURE: An error occurred while calling get_relevant_context().")
     print(f"Error details: {e}")
 
+# --- Test 5: Call get_relevant_context_batch for several sample queries ---
+# All cases share the provider built in Test 1 and are retrieved in one batch,
+# so the CSV parse, FAISS load and embeddings client are paid for once.
+SAMPLE_QUERIES = [
+    "details about claims",
+    "total premium amount per policy type",
+    "which providers handled the most procedures",
+    "claims submitted in the last month",
+    "members with an active insurance policy",
+    "average claim amount by specialty",
+]
+
+try:
+    print("\n--- Test 5: Calling get_relevant_context_batch() ---")
+    relevant_contexts = context_provider.get_relevant_context_batch(SAMPLE_QUERIES)
+    for sample_query, relevant_context in zip(SAMPLE_QUERIES, relevant_contexts):
+        if not relevant_context.get("relevant_schema") or relevant_context.get("relevant_schema") == "Relevant Database Schema:\n\n":
+            print(f"WARNING: get_relevant_context_batch() with query '{sample_query}' returned no specific relevant schema. This might be okay if the query doesn't match or CSVs are sparse.")
+        else:
+            print(f"SUCCESS: get_relevant_context_batch() returned a relevant schema for query '{sample_query}'.")
+            print(f"Relevant schema (first 300 chars):\n{relevant_context['relevant_schema'][:300]}...")
+
+        if not relevant_context.get("relevant_statements") or relevant_context.get("relevant_statements") == "-- No specific statements/examples retrieved.": # Default QueryRetriever response
+            print(f"INFO: get_relevant_context_batch() with query '{sample_query}' returned no specific relevant statements (this part depends on QueryRetriever & FAISS index, not CSVSchemaLoader directly).")
+
+except Exception as e:
+    print(f"FAILURE: An error occurred while calling get_relevant_context_batch().")
+    print(f"Error details: {e}")
+
 print("\nTest script finished.")
@@ -1,74 +1,122 @@
 import streamlit as st
-import pandas as pd
 import re
+import html
+import json
+
+# Upper bound on the JSON text shown per block in the debug panel
+MAX_DEBUG_BYTES = 20000
+
+# Styles for the query-understanding card, sent once per run instead of inline in every card
+_CHAT_CSS = """
+<style>
+.understanding-card { background-color: #f0f2f6; padding: 15px; border-radius: 10px; border: 1px solid #dfe1e5; margin-bottom: 10px; }
+.understanding-card h4 { margin-top: 0; margin-bottom: 10px; }
+.understanding-card hr { border-top: 1px solid #dfe1e5; margin-top: 10px; margin-bottom: 10px; }
+.understanding-card p.understanding-step { margin: 0.2em 0; }
+</style>
+"""
+
+# Static sidebar text, built once at import
+_SIDEBAR_INTRO = """
+This assistant helps you query databases using natural language. 
+Just ask a question about the data, and the assistant will generate 
+the appropriate SQL query.
+"""
+
+_SIDEBAR_EXAMPLES = """
+- Show all admission records where the total allowed amount is greater than 500.
+- List the first name and last name of patients for admissions with an ID less than 10.
+- What are the procedure codes (PROC_CD, ICD_PROC_CD) for admission ID 75?
+- Show responsible provider IDs and a count of admissions for each.
+- List admission IDs and their admit dates for admissions after January 1, 2023.
+- Which patient (MEMBER ID) has the most entries in the clinical markers table (CLINMARK_T)?
+- What are the distinct categories (CAT_DESC) available in the case data (CASD)?
+"""
 
 def display_schema_sidebar(table_info):
     """Display example questions in the sidebar."""
     with st.sidebar:
         st.title("Text2SQL Assistant")
         
-        st.markdown("""
-        This assistant helps you query databases using natural language. 
-        Just ask a question about the data, and the assistant will generate 
-        the appropriate SQL query.
-        """)
+        st.markdown(_SIDEBAR_INTRO)
         
         st.divider()
         st.subheader("Example Questions")
-        st.markdown("""
-        - Show all admission records where the total allowed amount is greater than 500.
-        - List the first name and last name of patients for admissions with an ID less than 10.
-        - What are the procedure codes (PROC_CD, ICD_PROC_CD) for admission ID 75?
-        - Show responsible provider IDs and a count of admissions for each.
-        - List admission IDs and their admit dates for admissions after January 1, 2023.
-        - Which patient (MEMBER ID) has the most entries in the clinical markers table (CLINMARK_T)?
-        - What are the distinct categories (CAT_DESC) available in the case data (CASD)?
-        """)
+        st.markdown(_SIDEBAR_EXAMPLES)
+
+def _split_breakdown(breakdown_data):
+    """Turn a query breakdown into the list of numbered step lines shown in the chat."""
+    steps = []
+    if isinstance(breakdown_data, list):
+        for i, step_text in enumerate(breakdown_data):
+            step_stripped = str(step_text).strip() # Ensure it's a string and stripped
+            if step_stripped:
+                # Prepend number to the step text itself
+                steps.append(f"{i+1}. {step_stripped}")
+    elif isinstance(breakdown_data, str) and breakdown_data.strip(): # Fallback if it's still a string
+        steps.append(breakdown_data.strip())
+    # If breakdown_data is None or an empty list, there are no steps.
+    return steps
+
+def _build_understanding_html(summary_text, breakdown_steps):
+    """Build the query-understanding card from escaped summary text and step lines."""
+    html_breakdown = "".join(f"<p class='understanding-step'>{step}</p>" for step in breakdown_steps)
+
+    understanding_html_content = f"""
+    <div class="understanding-card">
+        <h4>I understand your query as follows:</h4>
+        <p>{summary_text}</p>
+        <hr>
+        <h4>Here's my plan to answer it:</h4>
+        {html_breakdown}
+    </div>
+    """
+    return understanding_html_content
+
+def _render_understanding(message):
+    """Render a query_understanding message as the summary-and-plan card."""
+    # The card is built on first render and kept on the message, so later reruns
+    # redraw the stored HTML instead of rebuilding it
+    understanding_html = message.get("understanding_html")
+    if understanding_html is None:
+        # The producer stores HTML-escaped copies; messages without them are escaped here
+        summary_text = message.get("summary_html")
+        if summary_text is None:
+            summary_text = html.escape(str(message.get("summary", "")))
+        if "breakdown_html" in message:
+            breakdown_steps = _split_breakdown(message["breakdown_html"]) # Breakdown is expected to be List[str]
+        else:
+            breakdown_steps = [html.escape(step) for step in _split_breakdown(message.get("breakdown"))]
+        understanding_html = _build_understanding_html(summary_text, breakdown_steps)
+        message["understanding_html"] = understanding_html
+
+    st.markdown(understanding_html, unsafe_allow_html=True)
+
+def _render_content(message):
+    """Render a message's text content as markdown."""
+    st.markdown(message["content"])
+
+def _render_default(message):
+    """Render any other message that carries text content."""
+    if "content" in message: 
+        st.markdown(message["content"])
+
+_AVATARS = {"user": "👤", "assistant": "🤖"}
+
+# Message renderers keyed by (role, type); anything else goes to _render_default
+_RENDERERS = {
+    ("assistant", "query_understanding"): _render_understanding,
+    ("assistant", "simple_explanation"): _render_content,
+    ("user", None): _render_content,
+}
 
 def display_chat_messages(messages):
     """Display chat messages with avatars and styling."""
+    if any(message.get("type") == "query_understanding" for message in messages):
+        st.markdown(_CHAT_CSS, unsafe_allow_html=True)
     for message in messages:
-        avatar = "👤" if message["role"] == "user" else "🤖"
-        with st.chat_message(message["role"], avatar=avatar):
-            if message["role"] == "assistant" and message.get("type") == "query_understanding":
-                summary_text = message.get("summary", "")
-                # New simplified logic for breakdown processing:
-                breakdown_data = message.get("breakdown") # This is now expected to be List[str]
-
-                html_breakdown_lines = []
-                if isinstance(breakdown_data, list):
-                    for i, step_text in enumerate(breakdown_data):
-                        step_stripped = str(step_text).strip() # Ensure it's a string and stripped
-                        if step_stripped:
-                            # Prepend number to the step text itself, then wrap in <p>
-                            html_breakdown_lines.append(f"<p style='margin: 0.2em 0;'>{i+1}. {step_stripped}</p>")
-                elif isinstance(breakdown_data, str) and breakdown_data.strip(): # Fallback if it's still a string
-                    # Fallback for string, remove logger.warning as logger is not available here
-                    html_breakdown_lines.append(f"<p style='margin: 0.2em 0;'>{breakdown_data.strip()}</p>")
-                # If breakdown_data is None or empty list, html_breakdown_lines will be empty.
-                
-                html_breakdown = "".join(html_breakdown_lines)
-                # The 'if not html_breakdown.strip() and breakdown_text_raw.strip():' fallback is removed as per new logic.
-                # The new logic handles empty list or None gracefully (empty html_breakdown).
-
-                understanding_html_content = f"""
-                <div style="background-color: #f0f2f6; padding: 15px; border-radius: 10px; border: 1px solid #dfe1e5; margin-bottom: 10px;">
-                    <h4 style="margin-top: 0; margin-bottom: 10px;">I understand your query as follows:</h4>
-                    <p>{summary_text}</p>
-                    <hr style="border-top: 1px solid #dfe1e5; margin-top: 10px; margin-bottom: 10px;">
-                    <h4 style="margin-top: 0; margin-bottom: 10px;">Here's my plan to answer it:</h4>
-                    {html_breakdown}
-                </div>
-                """
-                st.markdown(understanding_html_content, unsafe_allow_html=True)
-
-            elif message["role"] == "assistant" and message.get("type") == "simple_explanation":
-                st.markdown(message["content"])
-            elif message["role"] == "user":
-                st.markdown(message["content"])
-            else:
-                if "content" in message: 
-                    st.markdown(message["content"])
+        with st.chat_message(message["role"], avatar=_AVATARS.get(message["role"], "🤖")):
+            _RENDERERS.get((message["role"], message.get("type")), _render_default)(message)
 
 def display_query_results(graph_state):
     """Display query results from the graph state."""
@@ -81,6 +129,12 @@ def display_query_results(graph_state):
     if "error_message" in graph_state and graph_state["error_message"]:
         st.error(graph_state["error_message"])
 
+def _show_debug_json(json_text):
+    """Show JSON as flat highlighted text, cut at MAX_DEBUG_BYTES (st.json builds a DOM tree per key)."""
+    st.code(json_text[:MAX_DEBUG_BYTES], language="json")
+    if len(json_text) > MAX_DEBUG_BYTES:
+        st.caption(f"(truncated: showing {MAX_DEBUG_BYTES:,} of {len(json_text):,} characters)")
+
 def display_debug_info(show_debug, graph_state, debug_info):
     """Display debug information if enabled."""
     if not show_debug:
@@ -101,13 +155,19 @@ def display_debug_info(show_debug, graph_state, debug_info):
             st.write(f"- User feedback: {graph_state.get('user_feedback', 'None')}")
             
             st.write("### Full Graph State")
-            safe_state = {k: (str(v)[:500] + '...' if isinstance(v, str) and len(str(v)) > 500 else v) 
-                         for k, v in graph_state.items()}
-            st.json(safe_state)
+            # Serialize each graph state once; reruns for other widgets reuse the JSON text.
+            # The state object itself is kept (not its id) so a recycled id can't match.
+            cached = st.session_state.get("_safe_state_cache")
+            if cached is None or cached[0] is not graph_state:
+                safe_state = {k: (str(v)[:500] + '...' if isinstance(v, str) and len(str(v)) > 500 else v) 
+                             for k, v in graph_state.items()}
+                cached = (graph_state, json.dumps(safe_state, default=str, indent=2))
+                st.session_state["_safe_state_cache"] = cached
+            _show_debug_json(cached[1])
         
         if debug_info:
             st.write("### Debug Info")
-            st.json(debug_info)
+            _show_debug_json(json.dumps(debug_info, default=str, indent=2))
 
 def display_feedback_buttons(awaiting_feedback, process_feedback_func):
     """Display feedback buttons if awaiting feedback."""
@@ -123,15 +183,15 @@ def display_feedback_buttons(awaiting_feedback, process_feedback_func):
     
     col_spacer, col_btn1, col_btn2 = st.columns([2, 1, 1])
 
+    # The feedback is processed in on_click, before the rerun the click triggers, so the
+    # page is drawn once with the updated state instead of twice via st.rerun()
     with col_btn1:
-        if st.button("Yes, I approve the understanding", key="approve_understanding_feedback", use_container_width=True):
-            process_feedback_func("good")
-            st.rerun()
+        st.button("Yes, I approve the understanding", key="approve_understanding_feedback", use_container_width=True,
+                  on_click=process_feedback_func, args=("good",))
             
     with col_btn2:
-        if st.button("No, I want to modify the query", key="modify_query_feedback", use_container_width=True):
-            process_feedback_func("not_good")
-            st.rerun()
+        st.button("No, I want to modify the query", key="modify_query_feedback", use_container_width=True,
+                  on_click=process_feedback_func, args=("not_good",))
 
 def display_clarification_form(awaiting_clarification, process_clarification_func):
     """Display clarification form if awaiting clarification."""